@@ -1,3 +1,3 @@
-from .etherscan_api import EtherscanAPI
+from .etherscan_api import ChainInfo, EtherscanAPI
 
-__ALL__ = ['EtherscanAPI']
\ No newline at end of file
+__ALL__ = ['ChainInfo', 'EtherscanAPI']
\ No newline at end of file
@@ -1,24 +1,255 @@
-import requests
+import ast
+import atexit
+import importlib.util
 import json
+import logging
 import os
+import re
 import time
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+from urllib.parse import urlsplit
 
-# YAML支持（如果没有安装pyyaml，使用内置简单解析器）
-try:
-    import yaml
-    YAML_AVAILABLE = True
-    print("使用PyYAML解析器")
-except ImportError:
+log = logging.getLogger(__name__)
+
+# requests 和 yaml 导入开销较大（连带urllib3、certifi等），只在首次发请求/解析YAML时导入，
+# 配置已预编译且数据全部命中缓存时可省去这部分启动时间
+
+@lru_cache(maxsize=None)
+def _yaml_backend():
+    """
+    按需导入YAML解析器，返回 (模块, 加载器)
+    优先使用PyYAML（如果没有安装pyyaml，使用内置简单解析器，加载器为None）
+    """
+    try:
+        import yaml
+    except ImportError:
+        try:
+            from . import simple_yaml as yaml
+        except ImportError:
+            import simple_yaml as yaml
+        log.debug("使用内置简单YAML解析器")
+        return yaml, None
+    
+    log.debug("使用PyYAML解析器")
+    # 优先使用libyaml的C实现加载器，解析速度比纯Python实现快一个数量级
     try:
-        from . import simple_yaml as yaml
-        YAML_AVAILABLE = True
-        print("使用内置简单YAML解析器")
+        from yaml import CSafeLoader as loader
     except ImportError:
-        import simple_yaml as yaml
-        YAML_AVAILABLE = True
-        print("使用内置简单YAML解析器")
+        from yaml import SafeLoader as loader
+        log.warning("⚠️ 未检测到libyaml，使用纯Python YAML加载器（安装libyaml-dev后重装PyYAML可提速）")
+    return yaml, loader
+
+# 缓存数据序列化（优先使用C实现的orjson，未安装时使用标准库json）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# SQLite INTEGER 可直接存储的整数范围
+_SQLITE_INT_MIN = -2**63
+_SQLITE_INT_MAX = 2**63 - 1
+
+def _dumps(data):
+    """
+    序列化缓存数据：单个数值（如汇率）直接存为SQLite的REAL/INTEGER，无需JSON编解码；
+    其余数据orjson输出bytes（存为BLOB），标准库json输出str（存为TEXT）
+    """
+    data_type = type(data)
+    if data_type is float or (
+            data_type is int and _SQLITE_INT_MIN <= data <= _SQLITE_INT_MAX):
+        return data
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # orjson不支持超过64位的整数（如大额余额的wei值），交给标准库处理
+            pass
+    return json.dumps(data, ensure_ascii=False)
+
+def _loads(data):
+    """反序列化JSON数据（缓存或HTTP响应），按存储类型选择解析器，保证缓存中的大整数不丢失精度"""
+    if isinstance(data, (int, float)):
+        return data
+    if orjson is not None and isinstance(data, bytes):
+        return orjson.loads(data)
+    return json.loads(data)
+
+# 进程内缓存的条目上限，以及每写入多少次检查一次过期条目
+_MEM_CACHE_MAX_ENTRIES = 1024
+_MEM_CACHE_PRUNE_INTERVAL = 128
+
+# 后台清理过期缓存的最短间隔（秒）
+_CACHE_CLEANUP_MIN_INTERVAL = 60
+
+# 各类缓存数据的有效期（秒），按缓存键前缀匹配；未匹配的键使用配置中的 duration_minutes
+# 价格变化快而供应量、链列表几乎不变，统一有效期会让前者过旧、后者频繁失效
+_CACHE_TTLS = {
+    'price_': 60,
+    'token_info_': 60,
+    'balance_': 120,
+    'hashrate_': 600,
+    'supply_': 3600,
+    'usd_cny_rate': 3600,
+    'chainlist_data': 86400,
+}
+
+# 缓存热路径使用的固定SQL文本
+# sqlite3按SQL文本缓存预编译语句，各处必须复用完全相同的字符串才能命中
+_SQL_CACHE_GET = 'SELECT data, expires_at FROM cache_data WHERE cache_key = ? AND expires_at > ?'
+_SQL_CACHE_PUT = 'INSERT OR REPLACE INTO cache_data (cache_key, data, expires_at) VALUES (?, ?, ?)'
+_SQL_CACHE_GET_ANY = 'SELECT data, expires_at FROM cache_data WHERE cache_key = ?'
+# 链列表过期后仍作为旧数据先行使用（后台刷新），清理时保留
+_CHAINLIST_CACHE_KEY = 'chainlist_data'
+_SQL_CACHE_DELETE_EXPIRED = 'DELETE FROM cache_data WHERE expires_at <= ? AND cache_key != ?'
+# 一次扫描同时统计总条数和有效条数
+_SQL_CACHE_STATS = 'SELECT COUNT(*), COALESCE(SUM(expires_at > ?), 0) FROM cache_data'
+
+@lru_cache(maxsize=32)
+def _sql_cache_get_many(count):
+    """批量查询count个键的SQL，同一数量复用同一文本以命中预编译语句缓存"""
+    placeholders = ','.join('?' * count)
+    return ('SELECT cache_key, data, expires_at FROM cache_data '
+            f'WHERE cache_key IN ({placeholders}) AND expires_at > ?')
+
+# 已公布限额的API服务商：域名 -> (每秒请求数, 突发上限)，按主机名后缀匹配
+# 未列出的主机按配置中的 request_delay / burst_size 限流
+_HOST_RATE_LIMITS = {
+    # Etherscan V2 免费额度为每秒5次，所有chainid共用
+    'etherscan.io': (5.0, 5),
+    # CoinGecko 公共API约每分钟30次
+    'coingecko.com': (0.5, 5),
+    'blockchain.info': (1.0, 1),
+}
+
+# 代币到CoinGecko ID的映射（只读视图，各实例共享同一份表）
+COINGECKO_IDS = MappingProxyType({
+    'BTC': 'bitcoin',
+    'ETH': 'ethereum', 
+    'BNB': 'binancecoin',
+    'KAS': 'kaspa',
+    'MATIC': 'matic-network',
+    'AVAX': 'avalanche-2',
+    'LTC': 'litecoin',
+    'DOGE': 'dogecoin',
+    'ARB': 'arbitrum',
+    'OP': 'optimism',
+    'SOL': 'solana',
+    'BASE': 'base',
+    'BLAST': 'blast',
+    'SCROLL': 'scroll',
+    'LINEA': 'linea'
+})
+
+# 支持的代币符号，内容固定，list_supported_tokens 各次调用共享同一元组
+_SUPPORTED_TOKEN_SYMBOLS = tuple(COINGECKO_IDS)
+
+# CoinGecko请求URL模板
+_COINGECKO_PRICE_URL = 'https://api.coingecko.com/api/v3/simple/price?ids={}&vs_currencies=usd'
+_COINGECKO_COIN_URL = 'https://api.coingecko.com/api/v3/coins/{}'
+_COINGECKO_MARKETS_URL = 'https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&ids={}'
+
+# 链名称关键字到代币符号的映射规则（按优先级排列，靠前的关键字先匹配）
+_SYMBOL_MAP = (
+    # Ethereum生态
+    ('ethereum', 'ETH'),
+    ('sepolia', 'ETH_SEPOLIA'),
+    ('holesky', 'ETH_HOLESKY'),
+    
+    # BSC生态  
+    ('bnb smart chain', 'BNB'),
+    ('bsc', 'BNB'),
+    ('binance', 'BNB'),
+    
+    # Polygon生态
+    ('polygon', 'MATIC'),
+    ('matic', 'MATIC'),
+    ('zkevm', 'ZKEVM'),
+    
+    # Layer 2
+    ('arbitrum', 'ARB'),
+    ('optimism', 'OP'),
+    ('base', 'BASE'),
+    ('blast', 'BLAST'),
+    ('scroll', 'SCROLL'),
+    ('linea', 'LINEA'),
+    
+    # 其他主要链
+    ('avalanche', 'AVAX'),
+    ('cronos', 'CRO'),
+    ('celo', 'CELO'),
+    ('gnosis', 'GNOSIS'),
+    ('mantle', 'MNT'),
+    ('moonbeam', 'GLMR'),
+    ('moonriver', 'MOVR'),
+    ('bittorrent', 'BTT'),
+    ('fraxtal', 'FRAX'),
+    ('zksync', 'ZK'),
+)
+
+# 提取符号时需要加测试网后缀的关键字
+_TESTNET_SUFFIX_RE = re.compile('testnet|sepolia|holesky|fuji|amoy')
+
+# 判断测试网的关键字
+_TESTNET_RE = re.compile('testnet|sepolia|holesky|test|fuji|amoy|goerli')
+
+@dataclass(frozen=True)
+class ChainInfo:
+    """单条链的配置信息（不可变，使用__slots__存储以减少内存和属性访问开销）"""
+    __slots__ = ('chain_id', 'name', 'api_url', 'explorer')
+    chain_id: int
+    name: str
+    api_url: str
+    explorer: str
+
+@lru_cache(maxsize=1024)
+def _extract_token_symbol(chain_name):
+    """从链名称中提取代币符号"""
+    chain_name = chain_name.lower()
+    
+    # 按优先级找到第一个出现在链名称中的关键字
+    for pattern, symbol in _SYMBOL_MAP:
+        if pattern in chain_name:
+            break
+    else:
+        return None
+    
+    # 处理测试网后缀
+    if _TESTNET_SUFFIX_RE.search(chain_name):
+        if not symbol.endswith('_TEST') and not symbol.endswith('_SEPOLIA') and not symbol.endswith('_HOLESKY'):
+            if 'sepolia' in chain_name:
+                return f"{symbol.split('_')[0]}_SEPOLIA"
+            elif 'holesky' in chain_name:
+                return f"{symbol.split('_')[0]}_HOLESKY"  
+            else:
+                return f"{symbol.split('_')[0]}_TEST"
+    return symbol
+
+@lru_cache(maxsize=1024)
+def _is_testnet(chain_name):
+    """判断是否为测试网"""
+    return _TESTNET_RE.search(chain_name.lower()) is not None
+
+# 后台定时器和退出钩子只持有实例的弱引用，不阻止实例及其数据库连接被回收
+
+def _run_cache_cleanup(api_ref):
+    """定时器回调：实例仍存在时清理并重新排期"""
+    api = api_ref()
+    if api is not None:
+        api._clean_expired_cache()
+        api._schedule_cache_cleanup()
+
+def _close_at_exit(api_ref):
+    """退出钩子：关闭仍存在的实例"""
+    api = api_ref()
+    if api is not None:
+        api.close()
 
 class EtherscanAPI:
     """
@@ -33,45 +264,55 @@ class EtherscanAPI:
         api_keys = self.config.get('api_keys', {})
         self.api_key = api_keys.get('etherscan', '')
         
+        # 预先拼入API密钥的请求URL，调用时只需填入变化的参数
+        self._ethsupply_url = (
+            'https://api.etherscan.io/api?module=stats&action=ethsupply&apikey=' + self.api_key)
+        self._balance_url_tpl = (
+            'https://api.etherscan.io/v2/api?chainid={cid}&module=account&action=balance'
+            '&address={addr}&tag=latest&apikey=' + self.api_key)
+        
         # 缓存配置
         cache_config = self.config.get('cache', {})
         self.enable_cache = cache_config.get('enabled', True)
         self.cache_duration = cache_config.get('duration_minutes', 5)
         self.cache_db = cache_config.get('database', 'cache/token_cache.db')
+        self._ttls = dict(_CACHE_TTLS)
+        self._ttls.update(cache_config.get('ttls') or {})
         
         # API配置
         api_config = self.config.get('api', {})
         self.request_delay = api_config.get('request_delay', 2)
+        self.rate_burst = api_config.get('burst_size', 5)
+        # 配置中的 rate_limits（域名 -> 每秒请求数）覆盖内置限额，突发上限取 burst_size
+        self._rate_limits = dict(_HOST_RATE_LIMITS)
+        for domain, per_second in (api_config.get('rate_limits') or {}).items():
+            self._rate_limits[domain] = (float(per_second), self.rate_burst)
         self.timeout = api_config.get('timeout', 10)
+        self.max_workers = max(1, api_config.get('max_workers', 8))
         
         # 确保缓存目录存在并初始化数据库
         os.makedirs(os.path.dirname(self.cache_db), exist_ok=True)
         self._init_cache_db()
+        self._schedule_cache_cleanup()
+        
+        # 汇率的进程内缓存：(记录时间, 汇率)
+        self._cny_rate_cache = (float('-inf'), None)
+        self._cny_rate_lock = threading.Lock()
         
-        # 最后一次请求时间
-        self._last_request_time = 0
+        # 令牌桶：服务商域名或主机名 -> (剩余令牌, 上次补充时间(monotonic))
+        self._buckets = {}
+        self._rate_lock = threading.Lock()
         
-        # 初始化链映射（先用硬编码的备用映射，然后尝试从chainlist API更新）
-        self._init_chain_mappings()
+        # 共享HTTP会话在首次发请求时创建
+        self._http = None
+        self._http_lock = threading.Lock()
+        
+        # 链映射在首次访问 self.chains 时加载，不阻塞实例创建
+        self._chains = None
+        self._chains_lock = threading.Lock()
         
         # 代币到CoinGecko ID的映射
-        self.coingecko_ids = {
-            'BTC': 'bitcoin',
-            'ETH': 'ethereum', 
-            'BNB': 'binancecoin',
-            'KAS': 'kaspa',
-            'MATIC': 'matic-network',
-            'AVAX': 'avalanche-2',
-            'LTC': 'litecoin',
-            'DOGE': 'dogecoin',
-            'ARB': 'arbitrum',
-            'OP': 'optimism',
-            'SOL': 'solana',
-            'BASE': 'base',
-            'BLAST': 'blast',
-            'SCROLL': 'scroll',
-            'LINEA': 'linea'
-        }
+        self.coingecko_ids = COINGECKO_IDS
         
     def _load_config(self, path):
         """加载配置文件（支持YAML和JSON格式）"""
@@ -86,117 +327,300 @@ class EtherscanAPI:
             else:
                 raise FileNotFoundError(f'配置文件 {path} 不存在')
         
+        is_yaml = path.endswith(('.yaml', '.yml'))
+        if is_yaml:
+            # 快速路径：直接导入预编译的配置模块，跳过YAML解析
+            compiled = self._load_compiled_config(path)
+            if compiled is not None:
+                return compiled
+        
         try:
             with open(path, 'r', encoding='utf-8') as f:
-                if path.endswith(('.yaml', '.yml')) and YAML_AVAILABLE:
-                    return yaml.safe_load(f)
+                if is_yaml:
+                    yaml, loader = _yaml_backend()
+                    if loader is not None:
+                        config = yaml.load(f, Loader=loader)
+                    else:
+                        config = yaml.safe_load(f)
                 else:
                     return json.load(f)
         except Exception as e:
             raise ValueError(f'配置文件格式错误: {e}')
+        
+        self._write_compiled_config(path, config)
+        return config
+    
+    @staticmethod
+    def _compiled_config_path(path):
+        """预编译配置模块路径（与YAML文件同目录，如 config_compiled.py）"""
+        return os.path.splitext(path)[0] + '_compiled.py'
+    
+    def _load_compiled_config(self, path):
+        """加载预编译的配置模块，仅当其不早于YAML文件时有效"""
+        compiled_path = self._compiled_config_path(path)
+        try:
+            if os.stat(compiled_path).st_mtime_ns < os.stat(path).st_mtime_ns:
+                return None
+            spec = importlib.util.spec_from_file_location(
+                'config_compiled', compiled_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module.CONFIG
+        except Exception:
+            return None
+    
+    def _write_compiled_config(self, path, config):
+        """将解析后的配置写成Python字面量模块，供下次启动直接导入"""
+        source = repr(config)
+        try:
+            # 只有能还原为相同字面量的配置才写入（例如YAML日期类型无法写成字面量）
+            if ast.literal_eval(source) != config:
+                return
+        except (ValueError, SyntaxError):
+            return
+        
+        compiled_path = self._compiled_config_path(path)
+        tmp_path = compiled_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(f'# 由 {os.path.basename(path)} 自动生成，请勿手动修改\n')
+                f.write(f'CONFIG = {source}\n')
+            os.replace(tmp_path, compiled_path)
+        except OSError as e:
+            log.warning("写入预编译配置失败: %s", e)
     
     def _init_cache_db(self):
-        """初始化缓存数据库"""
+        """初始化缓存数据库（整个实例共用一个长连接）"""
+        self._conn = None
+        self._db_lock = threading.Lock()
+        self._cleanup_timer = None
+        
+        # 数据库前面的进程内缓存：cache_key -> (过期时刻(monotonic), 序列化后的数据)
+        # 保存序列化结果而不是对象本身，每次命中都解码出新对象，调用方修改返回值不会污染缓存
+        self._mem_cache = {}
+        self._mem_lock = threading.Lock()
+        self._mem_writes = 0
         if not self.enable_cache:
             return
         try:
-            with sqlite3.connect(self.cache_db) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
+            self._conn = sqlite3.connect(
+                self.cache_db, check_same_thread=False, isolation_level=None,
+                cached_statements=256)
+            atexit.register(_close_at_exit, weakref.ref(self))
+            
+            with self._db_lock:
+                # 缓存数据可随时重建，不需要完整持久化保证：
+                # WAL + NORMAL同步避免每次写入都fsync，并放大页缓存/内存映射
+                self._conn.execute('PRAGMA journal_mode=WAL')
+                self._conn.execute('PRAGMA synchronous=NORMAL')
+                # 多个进程共用缓存文件时，遇到写锁最多等待5秒而不是立即报错
+                self._conn.execute('PRAGMA busy_timeout=5000')
+                self._conn.execute('PRAGMA temp_store=MEMORY')
+                self._conn.execute('PRAGMA cache_size=-64000')
+                self._conn.execute('PRAGMA mmap_size=268435456')
+                
+                # 旧版本的表按写入时间戳计算过期，没有expires_at列，缓存可重建，直接删除重建
+                columns = {row[1] for row in self._conn.execute('PRAGMA table_info(cache_data)')}
+                if columns and 'expires_at' not in columns:
+                    self._conn.execute('DROP TABLE cache_data')
+                
+                # expires_at为过期时刻的UNIX秒数，读取时只需一次整数比较
+                self._conn.execute('''
                     CREATE TABLE IF NOT EXISTS cache_data (
                         cache_key TEXT PRIMARY KEY,
-                        data TEXT NOT NULL,
-                        timestamp DATETIME NOT NULL,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                        data BLOB NOT NULL,
+                        expires_at INTEGER NOT NULL
                     )
                 ''')
                 
                 # 创建索引
-                cursor.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_timestamp ON cache_data(timestamp)
+                self._conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_expires_at ON cache_data(expires_at)
                 ''')
-                conn.commit()
         except Exception as e:
-            print(f"初始化缓存数据库失败: {e}")
+            log.warning("初始化缓存数据库失败: %s", e)
     
-    def _is_cache_valid(self, timestamp):
-        """检查缓存是否有效"""
-        if not self.enable_cache:
-            return False
-        try:
-            cache_time = datetime.fromisoformat(timestamp)
-            now = datetime.now()
-            return now - cache_time < timedelta(minutes=self.cache_duration)
-        except:
-            return False
+    def _mem_get(self, key):
+        """从进程内缓存读取并解码，未命中或已过期返回None"""
+        entry = self._mem_cache.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            return _loads(entry[1])
+        return None
+    
+    def _mem_set(self, key, value, expires_at):
+        """写入进程内缓存（value为_dumps的结果），过期时刻与数据库中的记录保持一致"""
+        ttl = expires_at - time.time()
+        with self._mem_lock:
+            self._mem_cache[key] = (time.monotonic() + ttl, value)
+            self._mem_writes += 1
+            if self._mem_writes % _MEM_CACHE_PRUNE_INTERVAL == 0:
+                self._mem_prune()
+    
+    def _mem_prune(self):
+        """清理进程内缓存的过期条目，超出上限时丢弃最早写入的条目（调用方需持有_mem_lock）"""
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._mem_cache.items() if expires_at <= now]:
+            del self._mem_cache[key]
+        overflow = len(self._mem_cache) - _MEM_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            for key in list(self._mem_cache)[:overflow]:
+                del self._mem_cache[key]
     
     def _get_cached_data(self, key):
-        """从数据库获取缓存数据"""
+        """获取缓存数据：先查进程内缓存，再查数据库（过期数据视为未命中，由后台定时清理）"""
         if not self.enable_cache:
             return None
         
+        data = self._mem_get(key)
+        if data is not None:
+            return data
+        
         try:
-            with sqlite3.connect(self.cache_db) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    'SELECT data, timestamp FROM cache_data WHERE cache_key = ?',
-                    (key,)
-                )
-                result = cursor.fetchone()
-                
-                if result and self._is_cache_valid(result[1]):
-                    return json.loads(result[0])
-                elif result:
-                    # 缓存过期，删除
-                    cursor.execute('DELETE FROM cache_data WHERE cache_key = ?', (key,))
-                    conn.commit()
+            with self._db_lock:
+                result = self._conn.execute(
+                    _SQL_CACHE_GET, (key, int(time.time()))).fetchone()
+            if result:
+                self._mem_set(key, result[0], result[1])
+                return _loads(result[0])
         except Exception as e:
-            print(f"获取缓存数据失败: {e}")
+            log.warning("获取缓存数据失败: %s", e)
         
         return None
     
+    def _get_cached_entry(self, key):
+        """获取缓存数据（包括已过期的），返回 (data, 是否仍有效)，无缓存时返回 (None, False)"""
+        if not self.enable_cache:
+            return None, False
+        
+        try:
+            with self._db_lock:
+                result = self._conn.execute(_SQL_CACHE_GET_ANY, (key,)).fetchone()
+            if result:
+                return _loads(result[0]), result[1] > time.time()
+        except Exception as e:
+            log.warning("获取缓存数据失败: %s", e)
+        
+        return None, False
+    
+    def _get_cached_many(self, keys):
+        """一次查询获取多个键的缓存数据，返回 {cache_key: data}（仅包含有效缓存）"""
+        if not self.enable_cache or not keys:
+            return {}
+        
+        result = {}
+        for key in keys:
+            data = self._mem_get(key)
+            if data is not None:
+                result[key] = data
+        missing = [key for key in keys if key not in result]
+        if not missing:
+            return result
+        
+        try:
+            with self._db_lock:
+                rows = self._conn.execute(
+                    _sql_cache_get_many(len(missing)), (*missing, int(time.time()))
+                ).fetchall()
+            for cache_key, value, expires_at in rows:
+                self._mem_set(cache_key, value, expires_at)
+                result[cache_key] = _loads(value)
+        except Exception as e:
+            log.warning("批量获取缓存数据失败: %s", e)
+        
+        return result
+    
+    def _ttl_for(self, key):
+        """按缓存键前缀确定有效期（秒）"""
+        for prefix, ttl in self._ttls.items():
+            if key.startswith(prefix):
+                return ttl
+        return self.cache_duration * 60
+    
     def _set_cached_data(self, key, data):
         """将数据保存到数据库缓存"""
         if not self.enable_cache:
             return
         
         try:
-            with sqlite3.connect(self.cache_db) as conn:
-                cursor = conn.cursor()
-                timestamp = datetime.now().isoformat()
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO cache_data (cache_key, data, timestamp)
-                    VALUES (?, ?, ?)
-                ''', (key, json.dumps(data, ensure_ascii=False), timestamp))
-                
-                conn.commit()
+            expires_at = int(time.time() + self._ttl_for(key))
+            value = _dumps(data)
+            with self._db_lock:
+                self._conn.execute(_SQL_CACHE_PUT, (key, value, expires_at))
+            self._mem_set(key, value, expires_at)
         except Exception as e:
-            print(f"保存缓存数据失败: {e}")
+            log.warning("保存缓存数据失败: %s", e)
+    
+    def _set_cached_many(self, items):
+        """
+        在同一个事务中批量保存多条缓存数据
+        items: (key, data) 序列
+        """
+        if not self.enable_cache or not items:
+            return
+        
+        try:
+            now = time.time()
+            rows = [(key, _dumps(data), int(now + self._ttl_for(key))) for key, data in items]
+            with self._db_lock:
+                # 连接处于自动提交模式，需显式开启事务，使多行写入只提交一次
+                self._conn.execute('BEGIN')
+                try:
+                    self._conn.executemany(_SQL_CACHE_PUT, rows)
+                except Exception:
+                    self._conn.execute('ROLLBACK')
+                    raise
+                self._conn.execute('COMMIT')
+            for key, value, expires_at in rows:
+                self._mem_set(key, value, expires_at)
+        except Exception as e:
+            log.warning("批量保存缓存数据失败: %s", e)
     
     def _clean_expired_cache(self):
         """清理过期的缓存数据"""
         if not self.enable_cache:
             return
         
+        with self._mem_lock:
+            self._mem_prune()
+        
         try:
-            with sqlite3.connect(self.cache_db) as conn:
-                cursor = conn.cursor()
-                cutoff_time = datetime.now() - timedelta(minutes=self.cache_duration)
-                
-                cursor.execute(
-                    'DELETE FROM cache_data WHERE timestamp < ?',
-                    (cutoff_time.isoformat(),)
-                )
-                
-                deleted_count = cursor.rowcount
-                conn.commit()
-                
-                if deleted_count > 0:
-                    print(f"清理了 {deleted_count} 条过期缓存")
+            with self._db_lock:
+                deleted_count = self._conn.execute(
+                    _SQL_CACHE_DELETE_EXPIRED, (int(time.time()), _CHAINLIST_CACHE_KEY)
+                ).rowcount
+            
+            if deleted_count > 0:
+                log.info("清理了 %d 条过期缓存", deleted_count)
                     
         except Exception as e:
-            print(f"清理缓存失败: {e}")
+            log.warning("清理缓存失败: %s", e)
+    
+    def _schedule_cache_cleanup(self):
+        """启动后台定时器，每个缓存周期（至少60秒）批量清理一次过期数据；周期不为正数时不启动"""
+        interval = self.cache_duration * 60
+        if self._conn is None or interval <= 0:
+            return
+        timer = threading.Timer(
+            max(_CACHE_CLEANUP_MIN_INTERVAL, interval), _run_cache_cleanup, (weakref.ref(self),))
+        timer.daemon = True
+        timer.start()
+        self._cleanup_timer = timer
+    
+    def close(self):
+        """停止后台清理，做最后一次过期数据清理后关闭数据库连接和HTTP会话（退出时自动调用）"""
+        if self._cleanup_timer is not None:
+            self._cleanup_timer.cancel()
+            self._cleanup_timer = None
+        
+        if self._conn is not None:
+            self._clean_expired_cache()
+            with self._db_lock:
+                self._conn.close()
+                self._conn = None
+            self.enable_cache = False
+        
+        if self._http is not None:
+            self._http.close()
     
     def get_cache_stats(self):
         """获取缓存统计信息"""
@@ -204,97 +628,179 @@ class EtherscanAPI:
             return {'cache_enabled': False}
         
         try:
-            with sqlite3.connect(self.cache_db) as conn:
-                cursor = conn.cursor()
-                
-                # 总缓存条数
-                cursor.execute('SELECT COUNT(*) FROM cache_data')
-                total_count = cursor.fetchone()[0]
-                
-                # 有效缓存条数
-                cutoff_time = datetime.now() - timedelta(minutes=self.cache_duration)
-                cursor.execute(
-                    'SELECT COUNT(*) FROM cache_data WHERE timestamp >= ?',
-                    (cutoff_time.isoformat(),)
-                )
-                valid_count = cursor.fetchone()[0]
-                
-                return {
-                    'cache_enabled': True,
-                    'total_cache_entries': total_count,
-                    'valid_cache_entries': valid_count,
-                    'expired_cache_entries': total_count - valid_count,
-                    'cache_duration_minutes': self.cache_duration
-                }
+            with self._db_lock:
+                # 总缓存条数和有效缓存条数
+                total_count, valid_count = self._conn.execute(
+                    _SQL_CACHE_STATS, (int(time.time()),)
+                ).fetchone()
+            
+            return {
+                'cache_enabled': True,
+                'total_cache_entries': total_count,
+                'valid_cache_entries': valid_count,
+                'expired_cache_entries': total_count - valid_count,
+                'cache_duration_minutes': self.cache_duration,
+                'cache_ttl_seconds': dict(self._ttls)
+            }
         except Exception as e:
             return {'cache_enabled': True, 'error': str(e)}
     
-    def _wait_for_rate_limit(self):
-        """等待API调用间隔"""
-        current_time = time.time()
-        time_since_last = current_time - self._last_request_time
-        if time_since_last < self.request_delay:
-            time.sleep(self.request_delay - time_since_last)
-        self._last_request_time = time.time()
+    def _rate_limit_for(self, host):
+        """
+        按主机名后缀查找限额，返回 (令牌桶键, (每秒请求数, 突发上限))
+        已登记的服务商以域名为键，其所有子域名共用同一个令牌桶；未登记的主机返回 (主机名, None)
+        """
+        for domain, limit in self._rate_limits.items():
+            if host == domain or host.endswith('.' + domain):
+                return domain, limit
+        return host, None
+    
+    def _acquire(self, url):
+        """
+        按主机的令牌桶限流：已公布限额的服务商（如Etherscan每秒5次）按其限额放行，
+        其余主机允许突发rate_burst个请求，平均速率不超过每request_delay秒一个；
+        不同主机之间互不阻塞；同一主机的并发请求在锁内依次预订时间片，各自在锁外等待，
+        等待时间相互重叠而不是排队累加
+        """
+        bucket_key, limit = self._rate_limit_for(urlsplit(url).hostname or '')
+        if limit is None:
+            if self.request_delay <= 0:
+                return
+            limit = (1.0 / self.request_delay, self.rate_burst)
+        rate, capacity = limit
+        if rate <= 0:
+            return
+        with self._rate_lock:
+            # 使用单调时钟，系统时间被调整时不会误放行或长时间阻塞
+            now = time.monotonic()
+            tokens, last_refill = self._buckets.get(bucket_key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last_refill) * rate)
+            # 令牌不足时记为欠额，调用者在锁外等待欠额补齐
+            tokens -= 1
+            self._buckets[bucket_key] = (tokens, now)
+        if tokens < 0:
+            time.sleep(-tokens / rate)
+    
+    @property
+    def _session(self):
+        """共享HTTP会话（首次发请求时导入requests并创建），复用TCP/TLS连接（keep-alive）"""
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = self._create_session()
+        return self._http
+    
+    def _create_session(self):
+        """
+        创建HTTP会话
+        每个主机的连接池要容纳所有并发线程：批量查询代币时每个代币会同时向
+        CoinGecko发出价格和供应量两个请求，因此按并发数的两倍保留keep-alive连接；
+        并对限流/服务端错误做少量退避重试
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=self.max_workers * 2,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False
+            )
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def _get_json(self, url):
+        """
+        限流后发送GET请求并解析JSON响应
+        非2xx状态抛出 requests.HTTPError；直接解析响应字节，跳过requests的编码探测和文本解码
+        """
+        self._acquire(url)
+        resp = self._session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        return _loads(resp.content)
     
     def get_usd_to_cny_rate(self):
         """获取美元对人民币汇率"""
+        # 进程内短期记忆，批量查询价格时避免重复访问数据库
+        memo_time, memo_rate = self._cny_rate_cache
+        if time.monotonic() - memo_time < 60:
+            return memo_rate
+        
+        # 并发查询多个代币价格时只由一个线程获取汇率，其余线程等待后直接复用
+        with self._cny_rate_lock:
+            memo_time, memo_rate = self._cny_rate_cache
+            if time.monotonic() - memo_time < 60:
+                return memo_rate
+            return self._fetch_usd_to_cny_rate()
+    
+    def _fetch_usd_to_cny_rate(self):
+        """从缓存或API获取美元对人民币汇率"""
         cache_key = 'usd_cny_rate'
         cached = self._get_cached_data(cache_key)
         if cached is not None:
+            self._cny_rate_cache = (time.monotonic(), cached)
             return cached
         
-        self._wait_for_rate_limit()
         try:
-            url = 'https://api.exchangerate-api.com/v4/latest/USD'
-            resp = requests.get(url, timeout=self.timeout)
-            if resp.status_code == 200:
-                data = resp.json()
-                if 'rates' in data and 'CNY' in data['rates']:
-                    rate = data['rates']['CNY']
-                    # 只有成功获取汇率时才缓存
-                    self._set_cached_data(cache_key, rate)
-                    return rate
+            data = self._get_json('https://api.exchangerate-api.com/v4/latest/USD')
+            if 'rates' in data and 'CNY' in data['rates']:
+                rate = data['rates']['CNY']
+                # 只有成功获取汇率时才缓存
+                self._set_cached_data(cache_key, rate)
+                self._cny_rate_cache = (time.monotonic(), rate)
+                return rate
         except Exception as e:
-            print(f"获取汇率失败: {e}")
+            log.warning("获取汇率失败: %s", e)
             
         # 失败时返回默认汇率，不缓存
         return 7.2
     
-    def get_token_price(self, token_symbol):
-        """获取代币价格（美元和人民币）"""
+    def get_token_price(self, token_symbol, usd_to_cny=None):
+        """
+        获取代币价格（美元和人民币）
+        usd_to_cny: 可选的美元兑人民币汇率，已知时传入可省去一次汇率查询
+        """
         token_symbol = token_symbol.upper()
         cache_key = f'price_{token_symbol}'
         cached = self._get_cached_data(cache_key)
         if cached is not None:
             return cached
         
+        result, cacheable = self._fetch_token_price(token_symbol, usd_to_cny)
+        if cacheable:
+            self._set_cached_data(cache_key, result)
+        return result
+    
+    def _fetch_token_price(self, token_symbol, usd_to_cny=None):
+        """从API获取代币价格，返回 (结果, 是否可缓存)"""
         coingecko_id = self.coingecko_ids.get(token_symbol)
         if not coingecko_id:
-            return None, None
+            return (None, None), False
         
-        self._wait_for_rate_limit()
         try:
-            url = f'https://api.coingecko.com/api/v3/simple/price?ids={coingecko_id}&vs_currencies=usd'
-            resp = requests.get(url, timeout=self.timeout)
-            if resp.status_code == 200:
-                data = resp.json()
-                if coingecko_id in data and 'usd' in data[coingecko_id]:
-                    usd_price = data[coingecko_id]['usd']
-                    
-                    # 获取汇率并计算人民币价格
+            data = self._get_json(_COINGECKO_PRICE_URL.format(coingecko_id))
+            if coingecko_id in data and 'usd' in data[coingecko_id]:
+                usd_price = data[coingecko_id]['usd']
+                
+                # 获取汇率并计算人民币价格
+                if usd_to_cny is None:
                     usd_to_cny = self.get_usd_to_cny_rate()
-                    cny_price = usd_price * usd_to_cny
-                    
-                    result = (usd_price, cny_price)
-                    # 只有成功获取价格数据时才缓存
-                    self._set_cached_data(cache_key, result)
-                    return result
+                cny_price = usd_price * usd_to_cny
+                
+                # 只有成功获取价格数据时才缓存
+                return (usd_price, cny_price), True
         except Exception as e:
-            print(f"获取{token_symbol}价格失败: {e}")
+            log.warning("获取%s价格失败: %s", token_symbol, e)
             
         # 失败时不缓存，直接返回
-        return None, None
+        return (None, None), False
     
     def get_token_supply(self, token_symbol):
         """获取代币供应量"""
@@ -304,19 +810,22 @@ class EtherscanAPI:
         if cached is not None:
             return cached
         
+        result, cacheable = self._fetch_token_supply(token_symbol)
+        if cacheable:
+            self._set_cached_data(cache_key, result)
+        return result
+    
+    def _fetch_token_supply(self, token_symbol):
+        """从API获取代币供应量，返回 (结果, 是否可缓存)"""
         result = None, token_symbol
         
         if token_symbol == 'ETH':
-            self._wait_for_rate_limit()
             try:
-                url = f'https://api.etherscan.io/api?module=stats&action=ethsupply&apikey={self.api_key}'
-                resp = requests.get(url, timeout=self.timeout)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if data.get('status') == '1':
-                        supply_wei = int(data['result'])
-                        supply_eth = supply_wei / (10**18)
-                        result = (supply_eth, 'ETH')
+                data = self._get_json(self._ethsupply_url)
+                if data.get('status') == '1':
+                    supply_wei = int(data['result'])
+                    supply_eth = supply_wei / (10**18)
+                    result = (supply_eth, 'ETH')
             except:
                 pass
         
@@ -324,20 +833,16 @@ class EtherscanAPI:
         if result[0] is None:
             coingecko_id = self.coingecko_ids.get(token_symbol)
             if coingecko_id:
-                self._wait_for_rate_limit()
                 try:
-                    url = f'https://api.coingecko.com/api/v3/coins/{coingecko_id}'
-                    resp = requests.get(url, timeout=self.timeout)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        supply = data.get('market_data', {}).get('circulating_supply')
-                        if supply:
-                            result = (supply, token_symbol)
+                    data = self._get_json(_COINGECKO_COIN_URL.format(coingecko_id))
+                    supply = data.get('market_data', {}).get('circulating_supply')
+                    if supply:
+                        result = (supply, token_symbol)
                 except:
                     pass
         
-        self._set_cached_data(cache_key, result)
-        return result
+        # 只有成功获取供应量时才缓存，失败结果不能按供应量的长有效期保留
+        return result, result[0] is not None
     
     def get_token_hashrate(self, token_symbol):
         """获取代币算力（仅适用于POW币种）"""
@@ -347,45 +852,41 @@ class EtherscanAPI:
         if cached is not None:
             return cached
         
+        result, cacheable = self._fetch_token_hashrate(token_symbol)
+        # 只有成功获取数据时才缓存
+        if cacheable:
+            self._set_cached_data(cache_key, result)
+        return result
+    
+    def _fetch_token_hashrate(self, token_symbol):
+        """从API获取代币算力，返回 (结果, 是否可缓存)"""
         result = None, 'N/A (POS)'
         success = False
         
         if token_symbol == 'BTC':
-            self._wait_for_rate_limit()
             try:
-                url = 'https://api.blockchain.info/stats'
-                resp = requests.get(url, timeout=self.timeout)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    hashrate = data.get('hash_rate')  # GH/s
-                    if hashrate:
-                        result = (hashrate, 'GH/s')
-                        success = True
+                data = self._get_json('https://api.blockchain.info/stats')
+                hashrate = data.get('hash_rate')  # GH/s
+                if hashrate:
+                    result = (hashrate, 'GH/s')
+                    success = True
             except Exception as e:
-                print(f"获取BTC算力失败: {e}")
+                log.warning("获取BTC算力失败: %s", e)
                 
         elif token_symbol == 'KAS':
-            self._wait_for_rate_limit()
             try:
-                url = 'https://api.kaspa.org/info/hashrate'
-                resp = requests.get(url, timeout=self.timeout)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    hashrate = data.get('hashrate')
-                    if hashrate:
-                        result = (hashrate, 'H/s')
-                        success = True
+                data = self._get_json('https://api.kaspa.org/info/hashrate')
+                hashrate = data.get('hashrate')
+                if hashrate:
+                    result = (hashrate, 'H/s')
+                    success = True
             except Exception as e:
-                print(f"获取KAS算力失败: {e}")
+                log.warning("获取KAS算力失败: %s", e)
         else:
             # 对于POS币种或其他非POW币种，直接返回并缓存
             success = True
         
-        # 只有成功获取数据时才缓存
-        if success:
-            self._set_cached_data(cache_key, result)
-        
-        return result
+        return result, success
     
     def get_chain_info(self, chain_symbol):
         """获取链信息"""
@@ -396,42 +897,47 @@ class EtherscanAPI:
         获取指定地址在多条链上的余额
         使用Etherscan V2 API的多链功能
         """
-        cache_key = f'balance_{address}_{"_".join(chains)}'
+        # 规范化链列表（去重、大写、排序）和地址大小写，使等价查询共用同一缓存
+        chains = tuple(sorted({chain.upper() for chain in chains}))
+        cache_key = f'balance_{address.lower()}_{"_".join(chains)}'
         cached = self._get_cached_data(cache_key)
         if cached is not None:
             return cached
         
-        results = {}
-        for chain in chains:
-            chain_info = self.get_chain_info(chain)
-            if not chain_info:
-                results[chain] = {'error': 'Chain not supported'}
-                continue
-            
-            self._wait_for_rate_limit()
-            try:
-                url = f'https://api.etherscan.io/v2/api?chainid={chain_info["chain_id"]}&module=account&action=balance&address={address}&tag=latest&apikey={self.api_key}'
-                resp = requests.get(url, timeout=self.timeout)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if data.get('status') == '1':
-                        balance_wei = int(data['result'])
-                        balance_eth = balance_wei / (10**18)
-                        results[chain] = {
-                            'balance': balance_eth,
-                            'balance_wei': balance_wei,
-                            'chain_name': chain_info['name']
-                        }
-                    else:
-                        results[chain] = {'error': data.get('message', 'API Error')}
-                else:
-                    results[chain] = {'error': f'HTTP {resp.status_code}'}
-            except Exception as e:
-                results[chain] = {'error': str(e)}
+        # 各链请求相互独立，并发发出以叠加网络延迟
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(chains)))) as executor:
+            balances = executor.map(
+                lambda chain: self._fetch_chain_balance(address, chain), chains)
+            results = dict(zip(chains, balances))
         
         self._set_cached_data(cache_key, results)        
         return results
     
+    def _fetch_chain_balance(self, address, chain):
+        """查询单条链上的余额（chain已规范为大写）"""
+        import requests
+        
+        chain_info = self.chains.get(chain)
+        if not chain_info:
+            return {'error': 'Chain not supported'}
+        
+        try:
+            data = self._get_json(self._balance_url_tpl.format(cid=chain_info.chain_id, addr=address))
+            if data.get('status') == '1':
+                balance_wei = int(data['result'])
+                balance_eth = balance_wei / (10**18)
+                return {
+                    'balance': balance_eth,
+                    'balance_wei': balance_wei,
+                    'chain_name': chain_info.name
+                }
+            return {'error': data.get('message', 'API Error')}
+        except requests.HTTPError as e:
+            # 只返回状态码，异常文本中的URL包含API密钥
+            return {'error': f'HTTP {e.response.status_code}'}
+        except Exception as e:
+            return {'error': str(e)}
+    
     def get_token_info(self, token_symbol):
         """
         获取代币完整信息
@@ -450,16 +956,41 @@ class EtherscanAPI:
         token_symbol = token_symbol.upper()
         cache_key = f'token_info_{token_symbol}'
         
-        # 检查完整缓存
-        cached = self._get_cached_data(cache_key)
-        if cached is not None:
-            cached['cached'] = True
-            return cached
+        price_key = f'price_{token_symbol}'
+        supply_key = f'supply_{token_symbol}'
+        hashrate_key = f'hashrate_{token_symbol}'
+        
+        # 一次查询同时取出完整缓存和各子项缓存
+        cached = self._get_cached_many(
+            [cache_key, price_key, supply_key, hashrate_key, 'usd_cny_rate'])
+        if cache_key in cached:
+            info = cached[cache_key]
+            info['cached'] = True
+            return info
         
-        # 获取各项数据
-        price_usd, price_cny = self.get_token_price(token_symbol)
-        supply, supply_unit = self.get_token_supply(token_symbol)
-        hashrate, hashrate_unit = self.get_token_hashrate(token_symbol)
+        # 未命中的子项互不依赖，并发请求；结果先暂存，最后与完整结果一起写入
+        fetchers = {}
+        if price_key not in cached:
+            usd_to_cny = cached.get('usd_cny_rate')
+            fetchers[price_key] = lambda: self._fetch_token_price(token_symbol, usd_to_cny)
+        if supply_key not in cached:
+            fetchers[supply_key] = lambda: self._fetch_token_supply(token_symbol)
+        if hashrate_key not in cached:
+            fetchers[hashrate_key] = lambda: self._fetch_token_hashrate(token_symbol)
+        
+        pending_writes = []
+        if fetchers:
+            with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+                futures = {key: executor.submit(fetch) for key, fetch in fetchers.items()}
+                for key, future in futures.items():
+                    value, cacheable = future.result()
+                    cached[key] = value
+                    if cacheable:
+                        pending_writes.append((key, value))
+        
+        price_usd, price_cny = cached[price_key]
+        supply, supply_unit = cached[supply_key]
+        hashrate, hashrate_unit = cached[hashrate_key]
         
         result = {
             'symbol': token_symbol,
@@ -473,9 +1004,100 @@ class EtherscanAPI:
             'cache_time': datetime.now().isoformat()
         }
         
-        # 缓存完整结果
-        self._set_cached_data(cache_key, result)
+        # 子项与完整结果在一个事务中写入
+        pending_writes.append((cache_key, result))
+        self._set_cached_many(pending_writes)
         return result
+    
+    def get_tokens_bulk(self, token_symbols):
+        """
+        通过一次CoinGecko /coins/markets 请求批量获取多个代币的价格和供应量
+        结果写入 price_*/supply_* 缓存，之后的 get_token_info 可直接命中而无需逐个请求
+        ETH的供应量以Etherscan为准，不使用这里的数据；缓存中已有价格和供应量的代币不再请求
+        返回: {代币符号: {'price_usd', 'price_cny', 'supply', 'supply_unit'}}，未获取到的代币不包含在内
+        """
+        ids = {}
+        for token_symbol in token_symbols:
+            token_symbol = token_symbol.upper()
+            coingecko_id = self.coingecko_ids.get(token_symbol)
+            if coingecko_id:
+                ids[coingecko_id] = token_symbol
+        
+        # 先查缓存，只请求未命中的代币
+        cached = self._get_cached_many([
+            f'{prefix}{token_symbol}'
+            for token_symbol in ids.values()
+            for prefix in ('token_info_', 'price_', 'supply_')
+        ])
+        results = {}
+        for coingecko_id, token_symbol in list(ids.items()):
+            info = cached.get(f'token_info_{token_symbol}')
+            price = cached.get(f'price_{token_symbol}')
+            supply = cached.get(f'supply_{token_symbol}')
+            if info is not None:
+                results[token_symbol] = {
+                    key: info[key] for key in ('price_usd', 'price_cny', 'supply', 'supply_unit')}
+            elif price is not None and (
+                    (supply is not None and supply[0] is not None) or token_symbol == 'ETH'):
+                # 旧版本可能缓存了失败的供应量 [None, 符号]，视为未命中以便重新获取
+                supply, supply_unit = supply or (None, token_symbol)
+                results[token_symbol] = {
+                    'price_usd': price[0], 'price_cny': price[1],
+                    'supply': supply, 'supply_unit': supply_unit}
+            else:
+                continue
+            del ids[coingecko_id]
+        if not ids:
+            return results
+        
+        try:
+            data = self._get_json(_COINGECKO_MARKETS_URL.format(','.join(ids)))
+        except Exception as e:
+            log.warning("批量获取代币行情失败: %s", e)
+            return results
+        if not isinstance(data, list):
+            # 出错时CoinGecko可能返回状态码200的错误对象
+            log.warning("批量获取代币行情失败: %s", data)
+            return results
+        
+        pending_writes = []
+        usd_to_cny = None
+        for entry in data:
+            token_symbol = ids.get(entry.get('id')) if isinstance(entry, dict) else None
+            if token_symbol is None:
+                continue
+            
+            info = {'price_usd': None, 'price_cny': None, 'supply': None, 'supply_unit': token_symbol}
+            
+            usd_price = entry.get('current_price')
+            if usd_price is not None:
+                if usd_to_cny is None:
+                    usd_to_cny = self.get_usd_to_cny_rate()
+                info['price_usd'] = usd_price
+                info['price_cny'] = usd_price * usd_to_cny
+                pending_writes.append((f'price_{token_symbol}', (usd_price, info['price_cny'])))
+            
+            supply = entry.get('circulating_supply')
+            if supply and token_symbol != 'ETH':
+                info['supply'] = supply
+                pending_writes.append((f'supply_{token_symbol}', (supply, token_symbol)))
+            
+            results[token_symbol] = info
+        
+        # 所有代币的子项在一个事务中写入
+        self._set_cached_many(pending_writes)
+        return results
+    
+    def get_tokens_info(self, token_symbols):
+        """
+        并发获取多个代币的完整信息
+        各代币的请求互不依赖，网络等待时间相互重叠；返回列表与传入顺序一致
+        """
+        token_symbols = list(token_symbols)
+        if not token_symbols:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(token_symbols))) as executor:
+            return list(executor.map(self.get_token_info, token_symbols))
 
     def list_supported_chains(self):
         """列出所有支持的链"""
@@ -487,8 +1109,8 @@ class EtherscanAPI:
     def list_supported_tokens(self):
         """列出所有支持的代币"""
         return {
-            'tokens': list(self.coingecko_ids.keys()),
-            'total_count': len(self.coingecko_ids)
+            'tokens': _SUPPORTED_TOKEN_SYMBOLS,
+            'total_count': len(_SUPPORTED_TOKEN_SYMBOLS)
         }
 
     def get_api_status(self):
@@ -499,6 +1121,7 @@ class EtherscanAPI:
             'supported_tokens_count': len(self.coingecko_ids),
             'cache_enabled': self.enable_cache,
             'cache_duration_minutes': self.cache_duration,
+            'cache_ttl_seconds': dict(self._ttls),
             'request_delay_seconds': self.request_delay
         }
     
@@ -507,72 +1130,89 @@ class EtherscanAPI:
         if not self.enable_cache:
             return False
         
+        with self._mem_lock:
+            self._mem_cache.clear()
+        
         try:
-            with sqlite3.connect(self.cache_db) as conn:
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM cache_data')
-                deleted_count = cursor.rowcount
-                conn.commit()
-                
-                print(f"清除了 {deleted_count} 条缓存数据")
-                return True
+            with self._db_lock:
+                deleted_count = self._conn.execute('DELETE FROM cache_data').rowcount
+            
+            log.info("清除了 %d 条缓存数据", deleted_count)
+            return True
         except Exception as e:
-            print(f"清除缓存失败: {e}")
+            log.warning("清除缓存失败: %s", e)
             return False
     
+    @property
+    def chains(self):
+        """链映射（首次访问时加载）"""
+        if self._chains is None:
+            with self._chains_lock:
+                if self._chains is None:
+                    # 由 _init_chain_mappings 赋值，这里不再覆盖（后台刷新可能已写入新映射）
+                    self._init_chain_mappings()
+        return self._chains
+    
     def _init_chain_mappings(self):
-        """初始化链映射，必须从chainlist API获取"""
-        # 尝试从chainlist API获取
+        """
+        初始化链映射，必须来自chainlist API的数据
+        有缓存时（即使已过期）立即使用，过期则在后台线程刷新；没有缓存时同步请求API
+        结果直接写入 self._chains 并返回
+        """
+        cached_data, fresh = self._get_cached_entry(_CHAINLIST_CACHE_KEY)
+        if cached_data:
+            cached_chains = self._parse_chainlist_data(cached_data)
+            if cached_chains:
+                log.debug("📦 使用缓存的chainlist数据，加载了 %d 个链配置", len(cached_chains))
+                # 先写入旧映射再启动刷新，保证刷新结果不会被旧映射覆盖
+                self._chains = cached_chains
+                if not fresh:
+                    threading.Thread(target=self._refresh_chains, daemon=True).start()
+                return cached_chains
+        
+        dynamic_chains = self._refresh_chains()
+        if dynamic_chains:
+            return dynamic_chains
+        
+        # 如果所有尝试都失败了，抛出异常
+        raise RuntimeError("❌ 无法初始化链映射：chainlist API不可用且不允许使用备用映射")
+    
+    def _refresh_chains(self):
+        """从chainlist API重新获取链映射并整体替换，失败时返回None"""
         try:
-            chainlist_data = self._get_chainlist_data()
+            chainlist_data = self._fetch_chainlist_data()
             if chainlist_data:
                 dynamic_chains = self._parse_chainlist_data(chainlist_data)
                 if dynamic_chains:
-                    self.chains = dynamic_chains
-                    print(f"📋 从chainlist API加载了 {len(dynamic_chains)} 个链配置")
-                    return
+                    self._chains = dynamic_chains
+                    log.debug("📋 从chainlist API加载了 %d 个链配置", len(dynamic_chains))
+                    return dynamic_chains
                 else:
-                    print("❌ chainlist数据解析失败")
+                    log.warning("❌ chainlist数据解析失败")
             else:
-                print("❌ 无法获取chainlist数据")
+                log.warning("❌ 无法获取chainlist数据")
         except Exception as e:
-            print(f"❌ chainlist初始化失败: {e}")
-        
-        # 如果所有尝试都失败了，抛出异常
-        raise RuntimeError("❌ 无法初始化链映射：chainlist API不可用且不允许使用备用映射")
+            log.warning("❌ chainlist初始化失败: %s", e)
+        return None
 
-    def _get_chainlist_data(self):
-        """获取chainlist数据（带缓存）"""
-        cache_key = "chainlist_data"
-        
-        # 尝试从缓存获取
-        cached_data = self._get_cached_data(cache_key)
-        if cached_data:
-            print("📦 使用缓存的chainlist数据")
-            return cached_data
-        
-        # 缓存未命中，从API获取
+    def _fetch_chainlist_data(self):
+        """从API获取chainlist数据并写入缓存"""
+        cache_key = _CHAINLIST_CACHE_KEY
         try:
-            print("🌐 从API获取chainlist数据...")
-            self._wait_for_rate_limit()
-            
-            url = "https://api.etherscan.io/v2/chainlist"
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
+            log.debug("🌐 从API获取chainlist数据...")
+            data = self._get_json("https://api.etherscan.io/v2/chainlist")
             
             if data.get('result'):
                 # 缓存数据
                 self._set_cached_data(cache_key, data)
-                print(f"✅ 获取到 {len(data['result'])} 条链配置数据")
+                log.debug("✅ 获取到 %d 条链配置数据", len(data['result']))
                 return data
             else:
-                print("❌ API返回数据格式异常")
+                log.warning("❌ API返回数据格式异常")
                 return None
                 
         except Exception as e:
-            print(f"❌ 获取chainlist数据失败: {e}")
+            log.warning("❌ 获取chainlist数据失败: %s", e)
             return None
     
     def _parse_chainlist_data(self, data):
@@ -581,125 +1221,50 @@ class EtherscanAPI:
             chains_result = data.get('result', [])
             
             # 解析链信息，优先保留主网链
-            mainnet_priority = {}  # 用于存储每个符号的最佳链选择
+            # 优先级元组越小越好：主网为 (0, chain_id)，即主网优先且选择较小的chain_id（通常是原生链）；
+            # 测试网统一为 (1, 0)，同符号的测试网之间保留先出现的一个
+            result_chains = {}  # 每个符号的最佳链选择
+            priority_of = {}
+            extract_symbol = _extract_token_symbol
+            is_testnet = _is_testnet
             
             for chain_info in chains_result:
-                chain_id = int(chain_info.get('chainid', 0))
-                chain_name = chain_info.get('chainname', '')
-                api_url = chain_info.get('apiurl', '')
-                block_explorer = chain_info.get('blockexplorer', '')
-                status = chain_info.get('status', 0)
-                
                 # 只处理状态为1（正常）的链
-                if status != 1:
+                if chain_info.get('status', 0) != 1:
                     continue
                 
                 # 提取代币符号
-                token_symbol = self._extract_token_symbol(chain_name, chain_id)
+                chain_name = chain_info.get('chainname', '')
+                token_symbol = extract_symbol(chain_name)
                 if not token_symbol:
                     continue
                 
-                # 构建链信息
-                chain_data = {
-                    'chain_id': chain_id,
-                    'name': chain_name,
-                    'api_url': api_url,
-                    'explorer': block_explorer
-                }
-                
                 # 优先级选择逻辑：主网 > 测试网
-                is_mainnet = not self._is_testnet(chain_name)
+                chain_id = int(chain_info.get('chainid', 0))
+                priority = (1, 0) if is_testnet(chain_name) else (0, chain_id)
+                existing = priority_of.get(token_symbol)
+                if existing is not None and not priority < existing:
+                    continue
                 
-                if token_symbol not in mainnet_priority:
-                    mainnet_priority[token_symbol] = (chain_data, is_mainnet, chain_id)
-                else:
-                    current_data, current_is_mainnet, current_id = mainnet_priority[token_symbol]
-                    
-                    # 如果当前是主网而存储的是测试网，则替换
-                    if is_mainnet and not current_is_mainnet:
-                        mainnet_priority[token_symbol] = (chain_data, is_mainnet, chain_id)
-                    # 如果都是主网，选择较小的chain_id（通常是原生链）
-                    elif is_mainnet and current_is_mainnet and chain_id < current_id:
-                        mainnet_priority[token_symbol] = (chain_data, is_mainnet, chain_id)
-            
-            # 构建最终映射
-            result_chains = {}
-            for symbol, (chain_data, is_mainnet, _) in mainnet_priority.items():
-                result_chains[symbol] = chain_data
+                # 构建链信息
+                priority_of[token_symbol] = priority
+                result_chains[token_symbol] = ChainInfo(
+                    chain_id,
+                    chain_name,
+                    chain_info.get('apiurl', ''),
+                    chain_info.get('blockexplorer', '')
+                )
             
-            print(f"📋 解析到 {len(result_chains)} 个链配置（优先选择主网）")
-            for symbol, data in list(result_chains.items())[:10]:  # 显示前10个
-                print(f"   {symbol}: {data['name']} (ID: {data['chain_id']})")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("📋 解析到 %d 个链配置（优先选择主网）", len(result_chains))
+                for symbol, data in list(result_chains.items())[:10]:  # 显示前10个
+                    log.debug("   %s: %s (ID: %d)", symbol, data.name, data.chain_id)
             
             return result_chains
             
         except Exception as e:
-            print(f"❌ 解析chainlist数据失败: {e}")
+            log.warning("❌ 解析chainlist数据失败: %s", e)
             return {}
-    
-    def _extract_token_symbol(self, chain_name, chain_id):
-        """从链名称中提取代币符号"""
-        chain_name = chain_name.lower()
-        
-        # 特殊映射规则
-        symbol_mappings = {
-            # Ethereum生态
-            'ethereum': 'ETH',
-            'sepolia': 'ETH_SEPOLIA' if 'sepolia' in chain_name else 'ETH',
-            'holesky': 'ETH_HOLESKY',
-            
-            # BSC生态  
-            'bnb smart chain': 'BNB',
-            'bsc': 'BNB',
-            'binance': 'BNB',
-            
-            # Polygon生态
-            'polygon': 'MATIC',
-            'matic': 'MATIC',
-            'zkevm': 'ZKEVM',
-            
-            # Layer 2
-            'arbitrum': 'ARB',
-            'optimism': 'OP', 
-            'base': 'BASE',
-            'blast': 'BLAST',
-            'scroll': 'SCROLL',
-            'linea': 'LINEA',
-            
-            # 其他主要链
-            'avalanche': 'AVAX',
-            'cronos': 'CRO',
-            'celo': 'CELO',
-            'gnosis': 'GNOSIS',
-            'mantle': 'MNT',
-            'moonbeam': 'GLMR',
-            'moonriver': 'MOVR',
-            'bittorrent': 'BTT',
-            'fraxtal': 'FRAX',
-            'zksync': 'ZK'
-        }
-        
-        # 遍历映射规则
-        for pattern, symbol in symbol_mappings.items():
-            if pattern in chain_name:
-                # 处理测试网后缀
-                if any(test in chain_name for test in ['testnet', 'sepolia', 'holesky', 'fuji', 'amoy']):
-                    if not symbol.endswith('_TEST') and not symbol.endswith('_SEPOLIA') and not symbol.endswith('_HOLESKY'):
-                        if 'sepolia' in chain_name:
-                            return f"{symbol.split('_')[0]}_SEPOLIA"
-                        elif 'holesky' in chain_name:
-                            return f"{symbol.split('_')[0]}_HOLESKY"  
-                        else:
-                            return f"{symbol.split('_')[0]}_TEST"
-                return symbol
-        
-        return None
-    
-    def _is_testnet(self, chain_name):
-        """判断是否为测试网"""
-        testnet_indicators = ['testnet', 'sepolia', 'holesky', 'test', 'fuji', 'amoy', 'goerli']
-        chain_name_lower = chain_name.lower()
-        return any(indicator in chain_name_lower for indicator in testnet_indicators)
 
 
 # 模块测试代码
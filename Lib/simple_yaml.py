@@ -2,84 +2,95 @@
 简单的YAML解析器 - 作为PyYAML的后备方案
 仅支持基本的YAML语法，足以解析我们的配置文件
 """
-import re
+import math
+
+# 布尔值和空值字面量（小写）
+_LITERALS = {'true': True, 'false': False, 'null': None, '~': None}
+
+def _parse_scalar(value):
+    """将标量字符串转换为对应类型的值：引号字符串 -> 字面量表 -> int -> float -> 原字符串"""
+    if value[:1] == '"' == value[-1:] and len(value) >= 2:
+        return value[1:-1]  # 移除引号
+    
+    lowered = value.lower()
+    if lowered in _LITERALS:
+        return _LITERALS[lowered]
+    
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    # 排除 nan/inf 等被float接受的普通单词
+    return number if math.isfinite(number) else value
 
 def simple_yaml_load(yaml_content):
     """
     简单的YAML解析器，支持基本语法：
     - 键值对 (key: value)
-    - 嵌套对象
+    - 嵌套字典
     - 列表
     - 注释 (# 开头的行)
     """
-    lines = yaml_content.split('\n')
     result = {}
-    current_dict = result
-    dict_stack = [result]
-    current_indent = 0
+    # 每层为 [键所在缩进, 内容缩进, 容器, 父容器, 键]，根层键缩进为-1，内容缩进在读到首行时确定
+    stack = [[-1, None, result, None, None]]
+    # 内容缩进 -> 所在层的栈深度，缩进回退时直接定位目标层
+    levels = {}
     
-    for line in lines:
+    for line in yaml_content.splitlines():
         # 去除注释
-        if '#' in line:
-            line = line[:line.index('#')]
+        pos = line.find('#')
+        if pos != -1:
+            line = line[:pos]
         
-        line = line.rstrip()
-        if not line.strip():
+        content = line.strip()
+        if not content:
             continue
-            
-        # 计算缩进
+        
         indent = len(line) - len(line.lstrip())
+        is_item = content == '-' or content.startswith('- ')
         
-        # 处理缩进变化
-        if indent < current_indent:
-            # 回退到对应的缩进层级
-            levels_back = (current_indent - indent) // 2
-            for _ in range(levels_back):
-                if len(dict_stack) > 1:
-                    dict_stack.pop()
-            current_dict = dict_stack[-1]
-            current_indent = indent
-        elif indent > current_indent:
-            current_indent = indent
+        frame = stack[-1]
+        if frame[1] is None and (indent > frame[0] or (is_item and indent == frame[0])):
+            # 新层的第一行；列表项可以与其所属的键处于同一缩进
+            frame[1] = indent
+            if indent > frame[0]:
+                levels[indent] = len(stack) - 1
+        elif indent != frame[1] or not (is_item or isinstance(frame[2], dict)):
+            # 回退到该缩进所在的层，缩进不一致的行忽略
+            depth = levels.get(indent)
+            if depth is None or depth >= len(stack) or stack[depth][1] != indent:
+                continue
+            del stack[depth + 1:]
+            frame = stack[-1]
         
-        line = line.strip()
+        container = frame[2]
+        
+        if is_item:
+            # 键下的第一个列表项：将占位的空字典替换为列表
+            if isinstance(container, dict):
+                if container or frame[3] is None:
+                    continue
+                container = frame[2] = frame[3][frame[4]] = []
+            container.append(_parse_scalar(content[1:].strip()))
+            continue
+        
+        key, sep, value = content.partition(':')
+        if not sep or not isinstance(container, dict):
+            continue
+        key = key.strip()
+        value = value.strip()
         
-        if ':' in line:
-            key, value = line.split(':', 1)
-            key = key.strip()
-            value = value.strip()
-            
-            if not value:  # 嵌套对象
-                new_dict = {}
-                current_dict[key] = new_dict
-                dict_stack.append(new_dict)
-                current_dict = new_dict
-            else:
-                # 处理不同类型的值
-                if value.startswith('"') and value.endswith('"'):
-                    value = value[1:-1]  # 移除引号
-                elif value.lower() == 'true':
-                    value = True
-                elif value.lower() == 'false':
-                    value = False
-                elif value.isdigit():
-                    value = int(value)
-                elif '.' in value and value.replace('.', '').isdigit():
-                    value = float(value)
-                    
-                current_dict[key] = value
-        elif line.startswith('-'):
-            # 处理列表项
-            item = line[1:].strip()
-            if item.startswith('"') and item.endswith('"'):
-                item = item[1:-1]
-                
-            # 如果当前字典的最后一个键没有值，将其设为列表
-            if current_dict and list(current_dict.keys()):
-                last_key = list(current_dict.keys())[-1]
-                if not isinstance(current_dict[last_key], list):
-                    current_dict[last_key] = []
-                current_dict[last_key].append(item)
+        if not value:  # 嵌套字典或列表
+            new_dict = {}
+            container[key] = new_dict
+            stack.append([indent, None, new_dict, container, key])
+        else:
+            container[key] = _parse_scalar(value)
     
     return result
 
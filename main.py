@@ -1,9 +1,15 @@
 import Lib
+import logging
 import time
 
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
 # 使用Config目录下的YAML配置文件
 api = Lib.EtherscanAPI()
 
+# 日志级别以配置文件为准（DEBUG可查看chainlist加载等详细信息）
+logging.getLogger().setLevel(api.config.get('logging', {}).get('level', 'INFO'))
+
 # 显示缓存统计信息
 print("=== 缓存状态 ===")
 cache_stats = api.get_cache_stats()
@@ -17,13 +23,15 @@ print("\n=== 代币市场数据 ===\n")
 # 测试获取代币信息
 tokens = ['BTC', 'ETH', 'KAS', 'BNB']
 
-for i, token in enumerate(tokens):
-    start_time = time.time()
-    info = api.get_token_info(token)
-    end_time = time.time()
-    
+# 先用一次批量请求取回所有代币的价格和供应量，再并发补齐其余数据
+start_time = time.time()
+api.get_tokens_bulk(tokens)
+infos = api.get_tokens_info(tokens)
+end_time = time.time()
+print(f"共 {len(infos)} 个代币，总获取耗时: {end_time - start_time:.2f}秒\n")
+
+for info in infos:
     print(f"代币: {info['symbol']}")
-    print(f"  获取耗时: {end_time - start_time:.2f}秒")
     print(f"  数据来源: {'缓存' if info.get('cached', False) else 'API'}")
     
     if info['price_usd'] is not None: